@@ -7,17 +7,23 @@ Access: http://127.0.0.1:8000
 Docs: http://127.0.0.1:8000/docs
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import asyncio
 import json
+import orjson
+import numpy as np
 import pandas as pd
+from collections import defaultdict
 from typing import Optional, List, Dict
 import os
 
 app = FastAPI(
     title="Fashion Sustainability Trends API",
     description="Backend API for sustainable fashion trend data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS for frontend
@@ -29,21 +35,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global data storage
-trends_data = []
+# Global data storage: everything derived from the trends file lives in one dict,
+# which load_data replaces wholesale. Handlers read `state` once per request, so
+# each one works from a single load even if a reload lands mid-request
+state = {
+    "trends_data": [],
+    "unique_keywords": [],
+    "keyword_index": {},  # keyword -> records
+    "keyword_lookup": {},  # lowercased keyword -> records, for /trends
+    "summary_bytes": b"{}",  # pre-serialized /trends/summary payload
+    "aggregated_bytes": b"[]",  # pre-serialized /trends/aggregated payload
+    "bulk_bytes": b"{}",  # pre-serialized /trends/bulk payload
+}
 
 def load_data():
-    """Load trends data from JSON file"""
-    global trends_data
+    """Load trends data from the Parquet cache (falls back to the legacy JSON file)"""
+    global state
     
-    trends_path = "data/trends_cache.json"
+    # Everything is built into locals and published by rebinding `state` at the
+    # end, so a failed parse leaves the previous data in place
+    trends_path = "data/trends_cache.parquet"
+    legacy_path = "data/trends_cache.json"
     if os.path.exists(trends_path):
-        with open(trends_path) as f:
-            trends_data = json.load(f)
-        print(f"✅ Loaded {len(trends_data)} trend records")
+        df = pd.read_parquet(trends_path)
+        # Dates are stored as datetime64; the API serves them as YYYY-MM-DD
+        if pd.api.types.is_datetime64_any_dtype(df["date"]):
+            df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+        records = df.to_dict("records")
+    elif os.path.exists(legacy_path):
+        # Stdlib json: the old writer emitted bare NaN tokens, which orjson rejects
+        with open(legacy_path) as f:
+            records = json.load(f)
     else:
         print(f"⚠️  Trends file not found: {trends_path}")
         print(f"   Run: python scripts/pull_trends.py")
+        return
+    
+    # Build keyword indexes in a single pass; they only change on reload
+    index = defaultdict(list)
+    lookup = defaultdict(list)
+    for t in records:
+        index[t['keyword']].append(t)
+        lookup[t['keyword'].lower()].append(t)
+    # Plain dicts, so lookups for unknown keywords can't insert empty entries
+    index = dict(index)
+    lookup = dict(lookup)
+    keywords = sorted(index)
+    
+    # Summary, aggregates and bulk only depend on the loaded data, so serialize them once here
+    summary = orjson.dumps(build_summary(keywords, index))
+    aggregated = orjson.dumps(build_aggregated(keywords, index))
+    bulk = orjson.dumps(build_bulk(keywords, index))
+    
+    state = {
+        "trends_data": records,
+        "unique_keywords": keywords,
+        "keyword_index": index,
+        "keyword_lookup": lookup,
+        "summary_bytes": summary,
+        "aggregated_bytes": aggregated,
+        "bulk_bytes": bulk,
+    }
+    print(f"✅ Loaded {len(records)} trend records")
 
 @app.on_event("startup")
 async def startup_event():
@@ -55,8 +108,8 @@ async def startup_event():
     print("=" * 60)
 
 def get_unique_keywords() -> List[str]:
-    """Get list of unique keywords from trend data"""
-    return sorted(list(set([t['keyword'] for t in trends_data])))
+    """Get list of unique keywords from trend data (computed in load_data)"""
+    return state["unique_keywords"]
 
 def calculate_trend_direction(scores: List[float]) -> str:
     """Calculate if trend is going up, down, or stable"""
@@ -90,11 +143,88 @@ def get_eco_score(keyword: str) -> Optional[int]:
     
     return None  # Placeholder - returns None for now
 
+def valid_scores(keyword_data: List[Dict]) -> np.ndarray:
+    """Trend scores for one keyword as a float64 array, with missing (NaN) scores dropped"""
+    scores = np.asarray(
+        [t['trend_score'] for t in keyword_data], dtype=np.float64
+    )
+    return scores[~np.isnan(scores)]
+
+def build_summary(keywords: List[str], index: Dict[str, List[Dict]]) -> Dict:
+    """Build per-keyword, per-brand summary statistics from a keyword index"""
+    brands = ["Patagonia", "Everlane", "Reformation"]  # Placeholder
+    
+    summary = {}
+    
+    for keyword in keywords:
+        keyword_data = index[keyword]
+        summary[keyword] = {}
+        
+        scores = valid_scores(keyword_data)
+        if scores.size == 0:
+            continue
+        
+        # Get eco-score (placeholder for now)
+        eco_score = get_eco_score(keyword)
+        if eco_score is None:
+            eco_score = 5  # Default middle value if no eco-score
+        
+        # Calculate metrics
+        direction = calculate_trend_direction(scores)
+        average_trend = round(float(scores.mean()), 1)
+        current_trend = int(scores[-1])
+        
+        # Create summary for each brand
+        for brand in brands:
+            summary[keyword][brand] = {
+                "average_trend": average_trend,
+                "current_trend": current_trend,
+                "average_eco": float(eco_score),
+                "current_eco": int(eco_score),
+                "trend_direction": direction,
+                "data_points": len(keyword_data)
+            }
+    
+    return summary
+
+def build_aggregated(keywords: List[str], index: Dict[str, List[Dict]]) -> List[Dict]:
+    """Build one average-trend row per keyword from a keyword index"""
+    rows = []
+    
+    for keyword in keywords:
+        keyword_data = index[keyword]
+        
+        scores = valid_scores(keyword_data)
+        if scores.size == 0:
+            continue
+        
+        rows.append({
+            "keyword": keyword,
+            "category": keyword_data[0].get('category', 'Other'),
+            "average_trend": float(scores.mean())
+        })
+    
+    return rows
+
+def build_bulk(keywords: List[str], index: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Build every keyword's records, enriched with eco-score and brand like /trends"""
+    bulk = {}
+    
+    for keyword in keywords:
+        eco_score = get_eco_score(keyword)
+        bulk[keyword] = [
+            {**record, 'eco_score': eco_score, 'brand': "Generic"}
+            for record in index[keyword]
+        ]
+    
+    return bulk
+
 # API ENDPOINTS
 
 @app.get("/")
-def root():
+async def root():
     """API health check and information"""
+    current = state
     return {
         "status": "running",
         "message": "Fashion Sustainability Trends API",
@@ -104,42 +234,41 @@ def root():
             "keywords": "/keywords",
             "brands": "/brands",
             "trends": "/trends?keyword=<keyword>&brand=<brand>",
+            "bulk": "/trends/bulk",
+            "aggregated": "/trends/aggregated",
             "summary": "/trends/summary",
             "reload": "POST /reload",
             "docs": "/docs"
         },
         "data_stats": {
-            "trends_count": len(trends_data),
-            "keywords_count": len(get_unique_keywords()),
+            "trends_count": len(current["trends_data"]),
+            "keywords_count": len(current["unique_keywords"]),
             "eco_score_integration": "pending"
         }
     }
 
 @app.get("/keywords")
-def get_keywords():
+async def get_keywords():
     """
     Get list of all available keywords
     Returns keywords grouped by category
     """
-    keywords = get_unique_keywords()
+    current = state
+    keywords = current["unique_keywords"]
     
-    categorized = {}
-    for t in trends_data:
-        keyword = t['keyword']
-        category = t.get('category', 'Other')
-        if category not in categorized:
-            categorized[category] = []
-        if keyword not in categorized[category]:
-            categorized[category].append(keyword)
+    buckets = defaultdict(set)
+    for t in current["trends_data"]:
+        buckets[t.get('category', 'Other')].add(t['keyword'])
+    categorized = {category: sorted(kws) for category, kws in buckets.items()}
     
-    return {
+    return ORJSONResponse(content={
         "keywords": keywords,
         "count": len(keywords),
         "by_category": categorized
-    }
+    })
 
 @app.get("/brands")
-def get_brands():
+async def get_brands():
     """
     Get list of available brands
     Currently returns placeholder data - will be populated from eco-scores
@@ -152,7 +281,7 @@ def get_brands():
     }
 
 @app.get("/trends")
-def get_trends(
+async def get_trends(
     keyword: str = Query(..., description="Keyword to get trends for"),
     brand: Optional[str] = Query(None, description="Optional brand filter")
 ):
@@ -161,7 +290,7 @@ def get_trends(
     Optionally filter by brand
     Includes eco-score if available
     """
-    filtered = [t for t in trends_data if t['keyword'].lower() == keyword.lower()]
+    filtered = state["keyword_lookup"].get(keyword.lower(), [])
     
     if not filtered:
         raise HTTPException(
@@ -180,65 +309,50 @@ def get_trends(
         enriched['brand'] = brand if brand else "Generic"
         result.append(enriched)
     
-    return result
+    return ORJSONResponse(content=result)
+
+@app.get("/trends/bulk")
+async def get_trends_bulk():
+    """
+    Get trend data for every keyword in a single response
+    Returns records grouped by keyword, enriched the same way as /trends
+    Served from the payload serialized in load_data
+    """
+    return Response(content=state["bulk_bytes"], media_type="application/json")
+
+@app.get("/trends/aggregated")
+async def get_trends_aggregated():
+    """
+    Get the average trend score for every keyword
+    Returns one row per keyword with its category
+    Served from the payload serialized in load_data
+    """
+    return Response(content=state["aggregated_bytes"], media_type="application/json")
 
 @app.get("/trends/summary")
-def get_trends_summary():
+async def get_trends_summary():
     """
     Get summary statistics for all trends
     Includes average scores, current scores, and trend direction
+    Served from the payload serialized in load_data
     """
-    keywords = get_unique_keywords()
-    brands = ["Patagonia", "Everlane", "Reformation"]  # Placeholder
-    
-    summary = {}
-    
-    for keyword in keywords:
-        summary[keyword] = {}
-        
-        keyword_data = [t for t in trends_data if t['keyword'] == keyword]
-        
-        if not keyword_data:
-            continue
-        
-        df = pd.DataFrame(keyword_data)
-        df['trend_score'] = pd.to_numeric(df['trend_score'], errors='coerce')
-        
-        # Get eco-score (placeholder for now)
-        eco_score = get_eco_score(keyword)
-        if eco_score is None:
-            eco_score = 5  # Default middle value if no eco-score
-        
-        # Calculate metrics
-        trend_scores = df['trend_score'].tolist()
-        direction = calculate_trend_direction(trend_scores)
-        
-        # Create summary for each brand
-        for brand in brands:
-            summary[keyword][brand] = {
-                "average_trend": round(float(df['trend_score'].mean()), 1),
-                "current_trend": int(df['trend_score'].iloc[-1]),
-                "average_eco": float(eco_score),
-                "current_eco": int(eco_score),
-                "trend_direction": direction,
-                "data_points": len(df)
-            }
-    
-    return summary
+    return Response(content=state["summary_bytes"], media_type="application/json")
 
 @app.post("/reload")
-def reload_data():
+async def reload_data():
     """
     Reload data from files
     Useful after running pull_trends.py to refresh data
     """
-    load_data()
+    # File parsing blocks, so keep it off the event loop
+    await asyncio.to_thread(load_data)
+    current = state
     return {
         "status": "success",
         "message": "Data reloaded successfully",
         "stats": {
-            "trends_count": len(trends_data),
-            "keywords_count": len(get_unique_keywords())
+            "trends_count": len(current["trends_data"]),
+            "keywords_count": len(current["unique_keywords"])
         }
     }
 
@@ -1,5 +1,16 @@
 from pytrends.request import TrendReq
 import pandas as pd
+import requests_cache
+
+# Serve repeated Google Trends queries from a local SQLite cache for an hour.
+# build_payload fetches its token with a POST and the data GET carries that
+# token, so cache POSTs too and leave the token out of the cache key
+requests_cache.install_cache(
+    "data/pytrends_cache",
+    expire_after=3600,
+    allowable_methods=("GET", "POST"),
+    ignored_parameters=["token"]
+)
 
 # Load data
 df = pd.read_csv("data/keywords.csv")
@@ -15,7 +26,7 @@ def batch_keywords(lst, n=5):
     for i in range(0, len(lst), n):
         yield lst[i:i + n]
 
-all_popularity = pd.DataFrame()
+popularity_parts = []
 
 for batch in batch_keywords(keywords, 5):
     pytrends.build_payload(batch, cat=67, timeframe='today 12-m', geo='CA')
@@ -25,7 +36,13 @@ for batch in batch_keywords(keywords, 5):
         data = data.drop(columns=['isPartial'])
         avg_pop = data.mean().reset_index()
         avg_pop.columns = ['clothing_item', 'popularity_score']
-        all_popularity = pd.concat([all_popularity, avg_pop], ignore_index=True)
+        popularity_parts.append(avg_pop)
+
+# Concatenate once; appending to a growing frame copies it every batch
+if popularity_parts:
+    all_popularity = pd.concat(popularity_parts, ignore_index=True)
+else:
+    all_popularity = pd.DataFrame(columns=['clothing_item', 'popularity_score'])
 
 # Merge back
 df = df.merge(all_popularity, on='clothing_item', how='left')
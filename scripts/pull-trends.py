@@ -1,41 +1,108 @@
 """
 Google Trends Data Extraction Script
-Pulls trend data for all keywords and saves to JSON
+Pulls trend data for all keywords and saves to Parquet
 
 Run: python scripts/pull_trends.py
-Output: data/trends_cache.json
+Output: data/trends_cache.parquet
 """
 
 from pytrends.request import TrendReq
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 import pandas as pd
-import json
+import threading
 import time
 import os
 
 # File paths
 KEYWORDS_PATH = "keywords - Sheet1.csv"
-OUTPUT_PATH = "data/trends_cache.json"
+OUTPUT_PATH = "data/trends_cache.parquet"
+QUERY_CACHE_PATH = "data/pytrends_cache.parquet"  # per-query results from earlier runs
+QUERY_CACHE_EXPIRE = 3600  # seconds
+
+# Concurrency / rate limiting
+MAX_WORKERS = 4
+REQUEST_INTERVAL = 2.0  # minimum seconds between Google Trends requests
+
+class RateLimiter:
+    """Space out calls across threads so one starts at most every `interval` seconds"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+    
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+rate_limiter = RateLimiter(REQUEST_INTERVAL)
+
+# TrendReq keeps per-query state, so each worker thread reuses its own client
+_thread_local = threading.local()
+
+def get_pytrends() -> TrendReq:
+    """Return this thread's TrendReq client, creating it on first use"""
+    if not hasattr(_thread_local, "pytrends"):
+        _thread_local.pytrends = TrendReq(hl="en-US", tz=360)
+    return _thread_local.pytrends
+
+# Results keyed on (keyword, timeframe, geo). Cached at the DataFrame level rather
+# than with requests-cache: install_cache shares one SQLite connection between all
+# sessions, which isn't safe from the worker threads. Each key is written by one
+# worker only, and the file is saved from the main thread after the pool finishes.
+query_cache = {}
+
+def load_query_cache(path: str) -> dict:
+    """Load unexpired per-query results saved by earlier runs"""
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_parquet(path)
+    df = df[df["fetched_at"] > time.time() - QUERY_CACHE_EXPIRE]
+    return {
+        key: group.reset_index(drop=True)
+        for key, group in df.groupby(["keyword", "timeframe", "geo"])
+    }
+
+def save_query_cache(path: str, cache: dict):
+    """Save per-query results so the next run can skip those requests"""
+    if cache:
+        pd.concat(cache.values(), ignore_index=True).to_parquet(
+            path, compression="zstd", index=False
+        )
 
 def load_keywords(path: str) -> pd.DataFrame:
     """Load keywords from CSV file"""
-    df = pd.read_csv(path, header=None)
-    df.columns = ["category", "keyword"]
+    df = pd.read_csv(path, header=None, names=["category", "keyword"], usecols=[0, 1])
     df["keyword"] = df["keyword"].astype(str).str.strip()
     df = df.dropna()
     df = df[df["keyword"] != ""]
     df = df.drop_duplicates(subset=["keyword"])
     return df
 
-def pull_interest_over_time(keyword: str, timeframe: str = "today 3-m", geo: str = "CA") -> pd.DataFrame:
-    """Pull Google Trends data for a single keyword"""
+def pull_interest_over_time(keyword: str, timeframe: str = "today 3-m", geo: str = "CA") -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Pull Google Trends data for a single keyword (served from query_cache when fresh)
+    Returns (DataFrame, warning), where warning is None on success. Runs on worker
+    threads, so the caller prints the warning alongside that keyword's progress line
+    """
+    key = (keyword, timeframe, geo)
+    if key in query_cache:
+        return query_cache[key][["keyword", "date", "trend_score"]], None
+    
     try:
-        pytrends = TrendReq(hl="en-US", tz=360)
+        # Creating a client fetches Google's cookies, so it waits its turn too
+        rate_limiter.wait()
+        pytrends = get_pytrends()
         pytrends.build_payload([keyword], timeframe=timeframe, geo=geo)
         df = pytrends.interest_over_time()
         
         if df is None or df.empty:
-            print(f"  ⚠️  No data for: {keyword}")
-            return pd.DataFrame()
+            return pd.DataFrame(), f"⚠️  No data for: {keyword}"
         
         if "isPartial" in df.columns:
             df = df.drop(columns=["isPartial"])
@@ -43,14 +110,15 @@ def pull_interest_over_time(keyword: str, timeframe: str = "today 3-m", geo: str
         df = df.reset_index()
         df.rename(columns={keyword: "trend_score"}, inplace=True)
         df["keyword"] = keyword
-        df["date"] = pd.to_datetime(df["date"]).dt.date.astype(str)
+        df["date"] = pd.to_datetime(df["date"])  # stays datetime64 through to Parquet
         df["trend_score"] = pd.to_numeric(df["trend_score"], errors="coerce")
+        df = df[["keyword", "date", "trend_score"]]
         
-        return df[["keyword", "date", "trend_score"]]
+        query_cache[key] = df.assign(timeframe=timeframe, geo=geo, fetched_at=time.time())
+        return df, None
         
     except Exception as e:
-        print(f"  ❌ Error for {keyword}: {str(e)}")
-        return pd.DataFrame()
+        return pd.DataFrame(), f"❌ Error for {keyword}: {str(e)}"
 
 def main():
     print("=" * 60)
@@ -60,6 +128,9 @@ def main():
     # Create data directory if it doesn't exist
     os.makedirs("data", exist_ok=True)
     
+    # Reuse results from earlier runs for queries that haven't expired
+    query_cache.update(load_query_cache(QUERY_CACHE_PATH))
+    
     # Load keywords
     print(f"\n📂 Loading keywords from: {KEYWORDS_PATH}")
     try:
@@ -78,28 +149,38 @@ def main():
     print(f"   Geography: Canada (CA)")
     print("-" * 60)
     
-    for idx, row in keywords_df.iterrows():
-        keyword = row['keyword']
-        category = row['category']
-        
-        print(f"[{idx+1}/{total}] {keyword} ({category})")
-        
-        trend_data = pull_interest_over_time(keyword, "today 3-m", "CA")
-        
-        if not trend_data.empty:
-            records = trend_data.to_dict('records')
-            # Add category to each record
-            for record in records:
-                record['category'] = category
-            all_trends.extend(records)
-            print(f"  ✅ Got {len(records)} data points")
+    rows = list(keywords_df.itertuples(index=False))
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(pull_interest_over_time, row.keyword, "today 3-m", "CA")
+            for row in rows
+        ]
         
-        time.sleep(3)
+        # Collect in submission order so progress output stays readable
+        for idx, (row, future) in enumerate(zip(rows, futures)):
+            keyword = row.keyword
+            category = row.category
+            
+            trend_data, warning = future.result()
+            print(f"[{idx+1}/{total}] {keyword} ({category})")
+            if warning:
+                print(f"  {warning}")
+            
+            if not trend_data.empty:
+                records = trend_data.to_dict('records')
+                # Add category to each record
+                for record in records:
+                    record['category'] = category
+                all_trends.extend(records)
+                print(f"  ✅ Got {len(records)} data points")
+    
+    save_query_cache(QUERY_CACHE_PATH, query_cache)
     
-    # Save to JSON
+    # Save to Parquet
     print(f"\n💾 Saving data to: {OUTPUT_PATH}")
-    with open(OUTPUT_PATH, 'w') as f:
-        json.dump(all_trends, f, indent=2)
+    trends_df = pd.DataFrame(all_trends, columns=["keyword", "date", "trend_score", "category"])
+    trends_df.to_parquet(OUTPUT_PATH, compression="zstd", index=False)
     
     # Summary
     print("\n" + "=" * 60)
@@ -108,7 +189,7 @@ def main():
     print(f"📊 Total records: {len(all_trends)}")
     print(f"🔑 Unique keywords: {len(set([t['keyword'] for t in all_trends]))}")
     if all_trends:
-        print(f"📅 Date range: {min([t['date'] for t in all_trends])} to {max([t['date'] for t in all_trends])}")
+        print(f"📅 Date range: {trends_df['date'].min():%Y-%m-%d} to {trends_df['date'].max():%Y-%m-%d}")
     print(f"💾 Output file: {OUTPUT_PATH}")
     print("=" * 60)
 
@@ -1,58 +1,61 @@
 import streamlit as st
 import pandas as pd
+import altair as alt
 
 import requests  
 
 API_BASE = "http://127.0.0.1:8000"  
 
-st.markdown(
-    """
-    <style>
-    /* Main app background */
-    .stApp {
-        background-color: white;
-        color: black;
-    }
-
-    /* Sidebar */
-    section[data-testid="stSidebar"] {
-        background-color: black;
-    }
-
-    section[data-testid="stSidebar"] * {
-        color: white;
-    }
-
-    </style>
-    """,
-    unsafe_allow_html=True
+CARD_TEMPLATE = (
+    '<div style="border: 1px solid #e6e6e6; border-radius: 12px; padding: 14px;">'
+    '<h4 style="margin: 0;">#{rank}</h4>'
+    '<h3 style="margin: 6px 0;">{item}</h3>'
+    '<p style="color: gray; margin: 0;">Trend score: {score:.2f}</p>'
+    '</div>'
 )
 
+# Page CSS and hero banner never change, so they go out in a single markdown call
+STATIC_HTML = """
+<style>
+/* Main app background */
+.stApp {
+    background-color: white;
+    color: black;
+}
+
+/* Sidebar */
+section[data-testid="stSidebar"] {
+    background-color: black;
+}
+
+section[data-testid="stSidebar"] * {
+    color: white;
+}
+
+</style>
+<div style="
+    background-color: black;
+    color: white;
+    padding: 1.5rem;
+    text-align: center;
+    border-radius: 0px 0px 10px 10px;
+    margin: -1rem -1rem 2rem -1rem;
+">
+    <h1 style="margin:0; font-size:2.5rem;">🌱 Sustainable Fashion Recommender</h1>
+</div>
+"""
+
 st.set_page_config(
     page_title="Sustainable Fashion Recommender",
     layout="wide"
 )
 
-st.markdown(
-    """
-    <div style="
-        background-color: black;
-        color: white;
-        padding: 1.5rem;
-        text-align: center;
-        border-radius: 0px 0px 10px 10px;
-        margin: -1rem -1rem 2rem -1rem;
-    ">
-        <h1 style="margin:0; font-size:2.5rem;">🌱 Sustainable Fashion Recommender</h1>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+st.markdown(STATIC_HTML, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=300)
+@st.cache_resource(ttl=300)
 def load_data():
-    """Fetch trend data from backend API"""
+    """Fetch per-keyword average trend scores from backend API"""
     try:
         # Check if backend is running
         health_check = requests.get(f"{API_BASE}/", timeout=3)
@@ -60,49 +63,36 @@ def load_data():
             st.error("⚠️ Backend API is not responding")
             return pd.DataFrame()
         
-        # Get all keywords from backend
-        keywords_response = requests.get(f"{API_BASE}/keywords", timeout=5)
+        # Averages are computed server-side, one row per keyword
+        aggregated_response = requests.get(f"{API_BASE}/trends/aggregated", timeout=10)
         
-        if not keywords_response.ok:
-            st.error("❌ Cannot fetch keywords from backend")
+        if not aggregated_response.ok:
+            st.error("❌ Cannot fetch trends from backend")
             return pd.DataFrame()
         
-        keywords_data = keywords_response.json()
-        all_keywords = keywords_data.get('keywords', [])
-        
-        # Fetch trend data for each keyword
-        all_data = []
-        
-        for keyword in all_keywords:
-            try:
-                trend_response = requests.get(
-                    f"{API_BASE}/trends",
-                    params={"keyword": keyword},
-                    timeout=5
-                )
-                
-                if trend_response.ok:
-                    trend_data = trend_response.json()
-                    
-                    if trend_data:
-                        df_temp = pd.DataFrame(trend_data)
-                        avg_score = df_temp['trend_score'].mean()
-                        category = df_temp['category'].iloc[0] if 'category' in df_temp.columns else 'Other'
-                        
-                        all_data.append({
-                            'keyword': category,
-                            'clothing_item': keyword,
-                            'popularity_score': avg_score
-                        })
-                        
-            except Exception as e:
-                continue
+        all_data = aggregated_response.json()
         
         if not all_data:
             st.warning("No trend data available from backend")
             return pd.DataFrame()
         
-        return pd.DataFrame(all_data)
+        df = pd.DataFrame(all_data).rename(columns={
+            'keyword': 'clothing_item',
+            'category': 'keyword',
+            'average_trend': 'popularity_score'
+        })
+        # Filters and groupbys compare integer codes instead of strings;
+        # scores are only displayed to 2 decimals, so float32 is plenty
+        df = df.astype({
+            'keyword': 'category',
+            'clothing_item': 'category',
+            'popularity_score': 'float32'
+        })
+        df = df.dropna(subset=['popularity_score'])
+        # Rank once here so any filtered slice is already in score order
+        return df.sort_values(
+            'popularity_score', ascending=False, kind='stable', ignore_index=True
+        )
     
     except requests.exceptions.ConnectionError:
         st.error("🔴 Cannot connect to backend API")
@@ -111,24 +101,80 @@ def load_data():
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
+
+
+@st.cache_data
+def build_top5_index(df):
+    """Precompute the top 5 clothing items for every category (df is presorted by score)"""
+    return {
+        category: group.head(5)
+        for category, group in df.groupby("keyword", sort=False, observed=True)
+    }
+
+
+@st.cache_data
+def load_indexes(df):
+    """Precompute the sidebar options: categories and each category's clothing items"""
+    # Alphabetical, not score order, so the options (and the default category)
+    # don't move around when the data is refreshed
+    categories = tuple(sorted(df['keyword'].unique()))
+    items_by_category = {
+        category: tuple(sorted(items))
+        for category, items in (
+            df.groupby('keyword', sort=False, observed=True)['clothing_item'].unique().items()
+        )
+    }
+    return categories, items_by_category
+
+
+@st.cache_data
+def category_averages(df):
+    """Average trend score per category; depends only on the loaded data"""
+    return (
+        df.groupby('keyword', sort=False, observed=True)['popularity_score']
+        .mean()
+        .sort_values(ascending=False)
+    )
+
+
+# Keyed on any subset of a category's items, so bound it; the ttl matches
+# load_data so entries for a replaced frame age out after a refresh
+@st.cache_data(max_entries=256, ttl=300)
+def render_bundle(df, category, items):
+    """Build the top-5 table and trending-card HTML for one filter state"""
+    if items:
+        # Single combined mask over the presorted frame
+        mask = (df['keyword'] == category) & df['clothing_item'].isin(items)
+        top_5 = df[mask].head(5)
+    else:
+        # Unfiltered view: served from the cached per-category ranking
+        top_5 = build_top5_index(df)[category]
+    
+    display_df = top_5[['clothing_item', 'popularity_score']]
+    cards_html = "".join(
+        CARD_TEMPLATE.format(rank=rank, item=item, score=score)
+        for rank, (item, score) in enumerate(
+            display_df.itertuples(index=False, name=None), start=1
+        )
+    )
+    return display_df, cards_html
+
 df = load_data()
 
 if df.empty:
     st.error("⚠️ No data loaded from backend!")
-    st.info("Check: 1) Backend is running 2) data/trends_cache.json exists")
+    st.info("Check: 1) Backend is running 2) data/trends_cache.parquet exists")
     st.stop()
 
 
 st.sidebar.header("Filters")
 
-categories = df['keyword'].unique()
+categories, items_by_category = load_indexes(df)
 selected_category = st.sidebar.selectbox(
     "Category",
     categories
 )
 
-filtered_df = df[df['keyword'] == selected_category]
-
 st.markdown(
     f"""
     <h2 style="
@@ -141,138 +187,60 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-items = filtered_df['clothing_item'].unique()
+items = items_by_category[selected_category]
 selected_item = st.sidebar.multiselect(
     "Filter by clothing item (optional)",
     items
 )
 
-if selected_item:
-    filtered_df = filtered_df[
-        filtered_df['clothing_item'].isin(selected_item)
-    ]
-
-
-
-top_5 = (
-    filtered_df
-    .sort_values("popularity_score", ascending=False)
-    .head(5)
+display_df, cards_html = render_bundle(
+    df, selected_category, tuple(sorted(selected_item))
 )
-display_df = top_5[['clothing_item', 'popularity_score']].copy()
 
-st.dataframe(display_df.head())
-display_df = display_df.dropna()
+st.dataframe(display_df)
 
 
+# Section header and all cards go out in one markdown call,
+# with the cards laid out two per row by a CSS grid
 st.markdown(
-    """
-    <h2 style="margin-bottom: 0;">TRENDING THIS WEEK</h2>
-    <p style="color: gray; margin-top: 4px;">brands</p>
-    """,
+    '<h2 style="margin-bottom: 0;">TRENDING THIS WEEK</h2>'
+    '<p style="color: gray; margin-top: 4px;">brands</p>'
+    '<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 12px; margin-bottom: 12px;">'
+    f'{cards_html}</div>',
     unsafe_allow_html=True
 )
 
-import math
-
-num_items = len(display_df)
-num_rows = math.ceil(num_items / 2)
-
-rank = 1
-
-for i in range(num_rows):
-    col1, col2 = st.columns(2)
-
-    # ---- LEFT CARD ----
-    if rank <= num_items:
-        row = display_df.iloc[rank - 1]
-        with col1:
-            st.markdown(
-                f"""
-                <div style="
-                    border: 1px solid #e6e6e6;
-                    border-radius: 12px;
-                    padding: 14px;
-                    margin-bottom: 12px;
-                ">
-                    <h4 style="margin: 0;">#{rank}</h4>
-                    <h3 style="margin: 6px 0;">{row['clothing_item']}</h3>
-                    <p style="color: gray; margin: 0;">
-                        Trend score: {row['popularity_score']:.2f}
-                    </p>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-        rank += 1
-
-    # ---- RIGHT CARD ----
-    if rank <= num_items:
-        row = display_df.iloc[rank - 1]
-        with col2:
-            st.markdown(
-                f"""
-                <div style="
-                    border: 1px solid #e6e6e6;
-                    border-radius: 12px;
-                    padding: 14px;
-                    margin-bottom: 12px;
-                ">
-                    <h4 style="margin: 0;">#{rank}</h4>
-                    <h3 style="margin: 6px 0;">{row['clothing_item']}</h3>
-                    <p style="color: gray; margin: 0;">
-                        Trend score: {row['popularity_score']:.2f}
-                    </p>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-        rank += 1
-
-import matplotlib.pyplot as plt
-
-st.markdown(
-    "<h3 style='margin-top:1rem;'>Trend Score Comparison</h3>",
-    unsafe_allow_html=True
+# Vega-Lite charts render in the browser, so no figure is rasterized server-side
+item_chart = (
+    alt.Chart(display_df)
+    .mark_bar()
+    .encode(
+        x=alt.X('popularity_score:Q', title='Trend Score'),
+        y=alt.Y('clothing_item:N', sort='-x', title=None)  # highest score at top
+    )
 )
 
-fig, ax = plt.subplots(figsize=(2, 1))
+category_avg = category_averages(df)
 
-ax.barh(
-    display_df['clothing_item'],
-    display_df['popularity_score']
+category_chart = (
+    alt.Chart(category_avg.reset_index())
+    .mark_bar()
+    .encode(
+        x=alt.X('keyword:N', sort='-y', title=None, axis=alt.Axis(labelAngle=-45)),
+        y=alt.Y('popularity_score:Q', title='Average Trend Score')
+    )
 )
 
-ax.invert_yaxis()  # highest score at top
-ax.set_xlabel("Trend Score")
-ax.set_ylabel("")
-
-
 st.markdown(
+    "<h3 style='margin-top:1rem;'>Trend Score Comparison</h3>"
     "<h3 style='margin-top:1rem;'>Average Trend Score by Category</h3>",
     unsafe_allow_html=True
 )
 
-category_avg = (
-    df.groupby('keyword')['popularity_score']
-    .mean()
-    .sort_values(ascending=False)
-)
-
-fig2, ax2 = plt.subplots(figsize=(3, 1))
-
-ax2.bar(
-    category_avg.index,
-    category_avg.values
-)
-
-ax2.set_ylabel("Average Trend Score")
-ax2.set_xticklabels(category_avg.index, rotation=45, ha='right')
-
 col1, col2 = st.columns(2)
 
 with col1:
-    st.pyplot(fig)
+    st.altair_chart(item_chart, use_container_width=True)
 
 with col2:
-    st.pyplot(fig2)
\ No newline at end of file
+    st.altair_chart(category_chart, use_container_width=True)